@@ -1,4 +1,4 @@
-from .base_agent import BaseAgent, AgentMessage
+from .base_agent import BaseAgent, AgentMessage, create_llm
 from .github_cloner import GitHubClonerAgent
 from .security_analyst import CodeSecurityAnalystAgent
 from .code_reviewer import CodeReviewerAgent
@@ -7,6 +7,7 @@ from .reporter import ReporterAgent
 __all__ = [
     'AgentMessage',
     'BaseAgent',
+    'create_llm',
     'GitHubClonerAgent',
     'CodeSecurityAnalystAgent',
     'CodeReviewerAgent',
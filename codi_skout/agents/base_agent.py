@@ -1,23 +1,95 @@
+import traceback
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from collections import deque
+from typing import Deque, List, Dict, Any, Optional, Union
 from langchain_groq import ChatGroq
 from datetime import datetime
 
-from core.message_bus import AgentMessage
+from core.message_bus import AgentMessage, MESSAGE_HISTORY_LIMIT
 from core.data_structures import SecurityAnalysisResult, CodeReviewResult, RepoAnalysisData
+from core.llm_cache import prompt_key, get_cached_response, put_cached_response
+from config.settings import LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS, LLM_STOP_SEQUENCES
 
 
+# Requests in flight at once when a chain runs over a batch of inputs
+_BATCH_CONCURRENCY = 8
+
+
+def create_llm(api_key: str) -> ChatGroq:
+    """Create the chat model used by the agents"""
+    return ChatGroq(
+        model=LLM_MODEL,
+        temperature=LLM_TEMPERATURE,
+        # Bound decode time: cap the output and stop at the prompts' end marker
+        max_tokens=LLM_MAX_TOKENS,
+        stop=LLM_STOP_SEQUENCES,
+        api_key=api_key
+    )
 
 
 # Base Agent Class
 class BaseAgent(ABC):
     """Abstract base class for all agents"""
     
-    def __init__(self, name: str, api_key: str):
+    def __init__(self, name: str, api_key: str, llm: Optional[ChatGroq] = None):
         self.name = name
         self.api_key = api_key
-        self.llm = ChatGroq(model="llama-3.1-8b-instant", temperature=0.1, api_key=api_key)
-        self.message_history: List[AgentMessage] = []
+        # Reuse a shared client when one is provided, otherwise create it on first use
+        self._llm = llm
+        # Reuse stored responses for byte-identical prompts (see core.llm_cache)
+        self.use_llm_cache = True
+        # Format tracebacks into failure results only when debugging;
+        # otherwise keep the exception and format it on request
+        self.debug = False
+        self._last_exc: Optional[BaseException] = None
+        self.message_history: Deque[AgentMessage] = deque(maxlen=MESSAGE_HISTORY_LIMIT)
+    
+    @property
+    def llm(self) -> ChatGroq:
+        """Chat model for this agent, created once on first access"""
+        if self._llm is None:
+            self._llm = create_llm(self.api_key)
+        return self._llm
+    
+    def invoke_chain(self, chain, prompt, inputs: Dict[str, Any]) -> str:
+        """Run a prompt | llm chain and return the response text, served from cache when possible"""
+        if not self.use_llm_cache:
+            return chain.invoke(inputs).content
+        
+        key = prompt_key(prompt.format(**inputs))
+        response = get_cached_response(key)
+        if response is None:
+            response = chain.invoke(inputs).content
+            put_cached_response(key, response)
+        return response
+    
+    def invoke_chain_batch(self, chain, prompt, inputs_list: List[Dict[str, Any]]) -> List[Union[str, Exception]]:
+        """Run a chain over several inputs concurrently; a failed item comes back as its exception"""
+        keys = [prompt_key(prompt.format(**inputs)) if self.use_llm_cache else None for inputs in inputs_list]
+        responses = [get_cached_response(key) if key is not None else None for key in keys]
+        
+        # Only the cache misses go to the model, in one batch
+        pending = [i for i, response in enumerate(responses) if response is None]
+        if pending:
+            outputs = chain.batch(
+                [inputs_list[i] for i in pending],
+                config={'max_concurrency': _BATCH_CONCURRENCY},
+                return_exceptions=True
+            )
+            for i, output in zip(pending, outputs):
+                if isinstance(output, Exception):
+                    responses[i] = output
+                    continue
+                responses[i] = output.content
+                if keys[i] is not None:
+                    put_cached_response(keys[i], output.content)
+        return responses
+    
+    def get_last_traceback(self) -> Optional[str]:
+        """Formatted traceback of the last exception this agent caught, if any"""
+        if self._last_exc is None:
+            return None
+        return "".join(traceback.format_exception(self._last_exc))
     
     def send_message(self, recipient: str, message_type: str, content: Dict[str, Any]) -> AgentMessage:
         """Send a message to another agent"""
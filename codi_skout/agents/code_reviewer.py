@@ -1,23 +1,40 @@
 import os
 import re
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 # LangChain imports
-from langchain.chains import LLMChain
+from langchain_groq import ChatGroq
 
 from .base_agent import BaseAgent
 from core.data_structures import RepoAnalysisData, CodeReviewResult
+from core.file_cache import read_file_head
 from config import CODE_REVIEW_PROMPT
 from config.constants import CODE_EXTENSIONS
 
 
+# Section headers of the review output, matched anywhere in a line
+_REVIEW_HEADER_RE = re.compile(
+    r'BEST_PRACTICES_VIOLATIONS|CODE_QUALITY_ISSUES|ARCHITECTURE_CONCERNS|DOCUMENTATION_GAPS|MAINTAINABILITY_SCORE',
+    re.IGNORECASE
+)
+_SCORE_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+
 class CodeReviewerAgent(BaseAgent):
     """Agent specialized in code quality and best practices review"""
     
-    def __init__(self, api_key: str):
-        super().__init__("CodeReviewer", api_key)
+    def __init__(self, api_key: str, llm: Optional[ChatGroq] = None):
+        super().__init__("CodeReviewer", api_key, llm)
         self.review_prompt = CODE_REVIEW_PROMPT
+        self._review_chain = None
+    
+    @property
+    def review_chain(self):
+        """Prompt | LLM chain, composed once on first use and reused for every review"""
+        if self._review_chain is None:
+            self._review_chain = self.review_prompt | self.llm
+        return self._review_chain
     
     def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Review code for quality and best practices"""
@@ -58,40 +75,32 @@ class CodeReviewerAgent(BaseAgent):
     
     def extract_code_samples(self, repo_path: str, files: List[str]) -> str:
         """Extract code samples from various files"""
-        code_samples = ""
+        code_samples = []
         
-
-
         # Focus on main code files
-        code_files = [f for f in files if any(f.endswith(ext) for ext in CODE_EXTENSIONS)]
+        code_files = [f for f in files if os.path.splitext(f)[1] in CODE_EXTENSIONS]
         
         for file_path in code_files[:15]:  # Limit to first 15 files
-            full_path = os.path.join(repo_path, file_path)
-            if os.path.exists(full_path):
-                try:
-                    with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()[:1500]  # First 1500 chars
-                        code_samples += f"\n--- {file_path} ---\n{content}\n"
-                except:
-                    continue
+            content = read_file_head(os.path.join(repo_path, file_path), 1500)  # First 1500 chars
+            if content is not None:
+                code_samples.append(f"\n--- {file_path} ---\n{content}\n")
         
-        return code_samples
+        # Join once instead of growing a string per file
+        return "".join(code_samples)
     
     def perform_code_review(self, repo_data: RepoAnalysisData, code_samples: str) -> CodeReviewResult:
         """Perform comprehensive code review"""
         
-        chain = self.review_prompt | self.llm
-        
         try:
-            result = chain.invoke({
-                'languages': ', '.join(repo_data.languages),
-                'file_structure': f"{len(repo_data.structure['files'])} files in {len(repo_data.structure.get('directories', []))} directories",
+            result = self.invoke_chain(self.review_chain, self.review_prompt, {
+                'languages': repo_data.languages_str,
+                'file_structure': f"{repo_data.structure['file_count']} files in {len(repo_data.structure.get('directories', []))} directories",
                 'code_samples': code_samples,
-                'endpoints': [ep['endpoint'] for ep in repo_data.endpoints]
+                'endpoints': repo_data.endpoint_paths
             })
             
             # Parse the result
-            parsed_result = self.parse_code_review(result.content)
+            parsed_result = self.parse_code_review(result)
             return parsed_result
             
         except Exception as e:
@@ -112,36 +121,32 @@ class CodeReviewerAgent(BaseAgent):
         documentation_gaps = []
         maintainability_score = 5.0
         
-        lines = review_text.split('\n')
-        current_section = None
+        section_items = {
+            'BEST_PRACTICES_VIOLATIONS': violations,
+            'CODE_QUALITY_ISSUES': quality_issues,
+            'ARCHITECTURE_CONCERNS': architecture_recs,
+            'DOCUMENTATION_GAPS': documentation_gaps
+        }
+        current_items = None
         
-        for line in lines:
+        for line in review_text.splitlines():
             line = line.strip()
+            if not line:
+                continue
+            
+            header = _REVIEW_HEADER_RE.search(line)
+            if header is None:
+                if current_items is not None:
+                    current_items.append(line)
+                continue
             
-            if 'BEST_PRACTICES_VIOLATIONS' in line.upper():
-                current_section = 'violations'
-            elif 'CODE_QUALITY_ISSUES' in line.upper():
-                current_section = 'quality_issues'
-            elif 'ARCHITECTURE_CONCERNS' in line.upper():
-                current_section = 'architecture'
-            elif 'DOCUMENTATION_GAPS' in line.upper():
-                current_section = 'documentation'
-            elif 'MAINTAINABILITY_SCORE' in line.upper():
-                try:
-                    score_match = re.search(r'(\d+(?:\.\d+)?)', line)
-                    if score_match:
-                        maintainability_score = float(score_match.group(1))
-                except:
-                    pass
-            elif line and current_section:
-                if current_section == 'violations':
-                    violations.append(line)
-                elif current_section == 'quality_issues':
-                    quality_issues.append(line)
-                elif current_section == 'architecture':
-                    architecture_recs.append(line)
-                elif current_section == 'documentation':
-                    documentation_gaps.append(line)
+            header_name = header.group(0).upper()
+            if header_name == 'MAINTAINABILITY_SCORE':
+                score_match = _SCORE_RE.search(line)
+                if score_match:
+                    maintainability_score = float(score_match.group(1))
+            else:
+                current_items = section_items[header_name]
         
         return CodeReviewResult(
             best_practices_violations=violations,
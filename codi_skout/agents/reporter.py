@@ -2,19 +2,31 @@ import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from langchain_groq import ChatGroq
 
 from .base_agent import BaseAgent
 from core.data_structures import SecurityAnalysisResult, CodeReviewResult
 
 
+# (security risk level, low maintainability) -> overall risk level
+_RISK_MATRIX = {
+    ('CRITICAL', False): 'CRITICAL', ('CRITICAL', True): 'CRITICAL',
+    ('HIGH', False): 'HIGH', ('HIGH', True): 'CRITICAL',
+    ('MEDIUM', False): 'MEDIUM', ('MEDIUM', True): 'HIGH',
+    ('LOW', False): 'LOW', ('LOW', True): 'MEDIUM'
+}
+# Unrecognized risk levels are treated as MEDIUM
+_UNRATED_RISK = {False: 'MEDIUM', True: 'HIGH'}
+
 
 # Reporter Agent
 class ReporterAgent(BaseAgent):
     """Agent responsible for collating and formatting reports"""
     
-    def __init__(self, api_key: str):
-        super().__init__("Reporter", api_key)
+    def __init__(self, api_key: str, llm: Optional[ChatGroq] = None):
+        super().__init__("Reporter", api_key, llm)
     
     def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive report from all agent analyses"""
@@ -51,10 +63,47 @@ class ReporterAgent(BaseAgent):
         # Extract results
         security_result = security_analysis.get('result') if security_analysis.get('success') else None
         review_result = code_review.get('result') if code_review.get('success') else None
+        structure = repo_data.get('structure', {})
+        languages = repo_data.get('languages', [])
         
-        # Calculate overall scores
-        overall_risk = self.calculate_overall_risk(security_result, review_result)
-        overall_quality = self.calculate_overall_quality(security_result, review_result)
+        # Read each result's fields once; the defaults stand in for a failed agent
+        if security_result:
+            security_section = {
+                'status': security_analysis.get('success', False),
+                'risk_level': security_result.risk_level,
+                'confidence_score': security_result.confidence_score,
+                'vulnerabilities': security_result.vulnerabilities,
+                'security_issues': security_result.security_issues,
+                'recommendations': security_result.recommendations
+            }
+        else:
+            security_section = {
+                'status': security_analysis.get('success', False),
+                'risk_level': 'UNKNOWN',
+                'confidence_score': 0.0,
+                'vulnerabilities': [],
+                'security_issues': [],
+                'recommendations': []
+            }
+        
+        if review_result:
+            review_section = {
+                'status': code_review.get('success', False),
+                'maintainability_score': review_result.maintainability_score,
+                'best_practices_violations': review_result.best_practices_violations,
+                'code_quality_issues': review_result.code_quality_issues,
+                'architecture_recommendations': review_result.architecture_recommendations,
+                'documentation_gaps': review_result.documentation_gaps
+            }
+        else:
+            review_section = {
+                'status': code_review.get('success', False),
+                'maintainability_score': 0.0,
+                'best_practices_violations': [],
+                'code_quality_issues': [],
+                'architecture_recommendations': [],
+                'documentation_gaps': []
+            }
         
         report = {
             'metadata': {
@@ -63,34 +112,20 @@ class ReporterAgent(BaseAgent):
                 'analysis_agents': ['GitHubCloner', 'CodeSecurityAnalyst', 'CodeReviewer', 'Reporter']
             },
             'executive_summary': {
-                'overall_risk_level': overall_risk,
-                'code_quality_score': overall_quality,
-                'total_files_analyzed': len(repo_data.get('structure', {}).get('files', [])),
-                'languages_detected': repo_data.get('languages', []),
+                'overall_risk_level': self.calculate_overall_risk(security_result, review_result),
+                'code_quality_score': self.calculate_overall_quality(security_result, review_result),
+                'total_files_analyzed': structure.get('file_count', 0),
+                'languages_detected': languages,
                 'critical_findings': self.extract_critical_findings(security_result, review_result)
             },
             'repository_overview': {
-                'structure': repo_data.get('structure', {}),
+                'structure': structure,
                 'endpoints': repo_data.get('endpoints', []),
                 'security_files': repo_data.get('security_files', []),
-                'languages': repo_data.get('languages', [])
-            },
-            'security_analysis': {
-                'status': security_analysis.get('success', False),
-                'risk_level': security_result.risk_level if security_result else 'UNKNOWN',
-                'confidence_score': security_result.confidence_score if security_result else 0.0,
-                'vulnerabilities': security_result.vulnerabilities if security_result else [],
-                'security_issues': security_result.security_issues if security_result else [],
-                'recommendations': security_result.recommendations if security_result else []
-            },
-            'code_review': {
-                'status': code_review.get('success', False),
-                'maintainability_score': review_result.maintainability_score if review_result else 0.0,
-                'best_practices_violations': review_result.best_practices_violations if review_result else [],
-                'code_quality_issues': review_result.code_quality_issues if review_result else [],
-                'architecture_recommendations': review_result.architecture_recommendations if review_result else [],
-                'documentation_gaps': review_result.documentation_gaps if review_result else []
+                'languages': languages
             },
+            'security_analysis': security_section,
+            'code_review': review_section,
             'actionable_recommendations': self.generate_actionable_recommendations(security_result, review_result),
             'priority_matrix': self.create_priority_matrix(security_result, review_result)
         }
@@ -102,15 +137,12 @@ class ReporterAgent(BaseAgent):
         if not security_result:
             return "UNKNOWN"
         
-        risk_levels = {'CRITICAL': 4, 'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
-        security_risk = risk_levels.get(security_result.risk_level, 2)
-        
-        # Factor in code quality
-        if review_result and review_result.maintainability_score < 3:
-            security_risk = min(security_risk + 1, 4)
-        
-        risk_names = {4: 'CRITICAL', 3: 'HIGH', 2: 'MEDIUM', 1: 'LOW'}
-        return risk_names.get(security_risk, 'MEDIUM')
+        # Factor in code quality: poor maintainability raises the risk one level
+        low_maintainability = bool(review_result and review_result.maintainability_score < 3)
+        return _RISK_MATRIX.get(
+            (security_result.risk_level, low_maintainability),
+            _UNRATED_RISK[low_maintainability]
+        )
     
     def calculate_overall_quality(self, security_result, review_result) -> float:
         """Calculate overall code quality score"""
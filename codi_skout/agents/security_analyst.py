@@ -1,38 +1,51 @@
 import os
+import re
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 
 # LangChain imports
 from config import SECURITY_ANALYSIS_PROMPT
-from langchain.chains import LLMChain
-from langchain_core.runnables import RunnableSequence
+from langchain_groq import ChatGroq
 
 from .base_agent import BaseAgent
 from core.data_structures import RepoAnalysisData, SecurityAnalysisResult
+from core.file_cache import read_file_head
 
 
+# Section headers of the analysis output, matched anywhere in a line
+_SECURITY_HEADER_RE = re.compile(
+    r'CRITICAL_VULNERABILITIES|HIGH_RISK_ISSUES|MEDIUM_RISK_ISSUES|SECURITY_RECOMMENDATIONS|RISK_ASSESSMENT',
+    re.IGNORECASE
+)
+_SCORE_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Threads used to read security file excerpts concurrently
+_READ_WORKERS = 8
 
 
 # Code Security Analyst Agent
 class CodeSecurityAnalystAgent(BaseAgent):
     """Agent specialized in security vulnerability analysis"""
     
-    def __init__(self, api_key: str):
-        super().__init__("CodeSecurityAnalyst", api_key)
+    def __init__(self, api_key: str, llm: Optional[ChatGroq] = None):
+        super().__init__("CodeSecurityAnalyst", api_key, llm)
         self.security_prompt = SECURITY_ANALYSIS_PROMPT
+        self._security_chain = None
+    
+    @property
+    def security_chain(self):
+        """Prompt | LLM chain, composed once on first use and reused for every analysis"""
+        if self._security_chain is None:
+            self._security_chain = self.security_prompt | self.llm
+        return self._security_chain
     
     def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze code for security vulnerabilities"""
         try:
-            repo_data = RepoAnalysisData(
-                repo_url=task_data['repo_url'],
-                repo_path=task_data['repo_path'],
-                structure=task_data['structure'],
-                endpoints=task_data['endpoints'],
-                security_files=task_data['structure'].get('security_files', []),
-                languages=task_data['structure'].get('languages', [])
-            )
+            repo_data = self.build_repo_data(task_data)
             
             # Extract security file contents
             security_content = self.extract_security_file_contents(
@@ -45,66 +58,121 @@ class CodeSecurityAnalystAgent(BaseAgent):
                 repo_data, security_content
             )
             
-            return {
-                'success': True,
-                'agent': self.name,
-                'analysis_type': 'security',
-                'result': analysis_result,
-                'message': f"Security analysis completed. Risk level: {analysis_result.risk_level}"
-            }
+            return self.success_response(analysis_result)
             
         except Exception as e:
-            return {
-                'success': False,
-                'agent': self.name,
-                'error': str(e),
-                'trace': traceback.format_exc(),
-                'message': f"Security analysis failed: {str(e)}"
-            }
+            return self.failure_response(e)
+    
+    def process_many(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze several repositories with one batched LLM call, results in input order"""
+        try:
+            chain_inputs = []
+            for task_data in tasks:
+                repo_data = self.build_repo_data(task_data)
+                security_content = self.extract_security_file_contents(
+                    repo_data.repo_path,
+                    repo_data.security_files
+                )
+                chain_inputs.append(self.security_inputs(repo_data, security_content))
+            
+            responses = self.invoke_chain_batch(self.security_chain, self.security_prompt, chain_inputs)
+        except Exception as e:
+            return [self.failure_response(e) for _ in tasks]
+        
+        return [
+            self.success_response(
+                self.error_analysis(response) if isinstance(response, Exception)
+                else self.parse_security_analysis(response)
+            )
+            for response in responses
+        ]
+    
+    def build_repo_data(self, task_data: Dict[str, Any]) -> RepoAnalysisData:
+        """Repository data for one analysis task"""
+        return RepoAnalysisData(
+            repo_url=task_data['repo_url'],
+            repo_path=task_data['repo_path'],
+            structure=task_data['structure'],
+            endpoints=task_data['endpoints'],
+            security_files=task_data['structure'].get('security_files', []),
+            languages=task_data['structure'].get('languages', [])
+        )
+    
+    def success_response(self, analysis_result: SecurityAnalysisResult) -> Dict[str, Any]:
+        """Task result for a completed analysis"""
+        return {
+            'success': True,
+            'agent': self.name,
+            'analysis_type': 'security',
+            'result': analysis_result,
+            'message': f"Security analysis completed. Risk level: {analysis_result.risk_level}"
+        }
+    
+    def failure_response(self, e: Exception) -> Dict[str, Any]:
+        """Task result for an analysis that could not run"""
+        self._last_exc = e
+        return {
+            'success': False,
+            'agent': self.name,
+            'error': str(e),
+            'trace': traceback.format_exc() if self.debug else None,
+            'message': f"Security analysis failed: {str(e)}"
+        }
     
     def extract_security_file_contents(self, repo_path: str, security_files: List[str]) -> str:
         """Extract contents from security-related files"""
-        content = ""
+        parts = []
+        selected_files = security_files[:10]  # Limit to first 10 files
+        if not selected_files:
+            return ""
         
-        for file_path in security_files[:10]:  # Limit to first 10 files
-            full_path = os.path.join(repo_path, file_path)
-            if os.path.exists(full_path):
-                try:
-                    with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        file_content = f.read()[:2000]  # First 2000 chars
-                        content += f"\n--- {file_path} ---\n{file_content}\n"
-                except:
-                    continue
+        # Reads are I/O bound, so overlap them; map() keeps the file order
+        full_paths = [os.path.join(repo_path, file_path) for file_path in selected_files]
+        with ThreadPoolExecutor(max_workers=min(_READ_WORKERS, len(full_paths))) as executor:
+            contents = executor.map(read_file_head, full_paths, repeat(2000))  # First 2000 chars
+            for file_path, file_content in zip(selected_files, contents):
+                if file_content is not None:
+                    parts.append(f"\n--- {file_path} ---\n{file_content}\n")
         
-        return content
+        return "".join(parts)
     
     def analyze_security_vulnerabilities(self, repo_data: RepoAnalysisData, 
                                        security_content: str) -> SecurityAnalysisResult:
         """Perform detailed security analysis using LLM"""
         
-        chain = self.security_prompt | self.llm
-        
         try:
-            result = chain.invoke({
-                'code_structure': f"{len(repo_data.structure['files'])} files analyzed",
-                'security_files': repo_data.security_files,
-                'languages': ', '.join(repo_data.languages),
-                'endpoints': [ep['endpoint'] for ep in repo_data.endpoints],
-                'file_contents': security_content
-            })
+            result = self.invoke_chain(
+                self.security_chain,
+                self.security_prompt,
+                self.security_inputs(repo_data, security_content)
+            )
             
             # Parse the result
-            parsed_result = self.parse_security_analysis(result.content)
+            parsed_result = self.parse_security_analysis(result)
             return parsed_result
             
         except Exception as e:
-            return SecurityAnalysisResult(
-                vulnerabilities=[f"Analysis error: {str(e)}"],
-                security_issues=[],
-                recommendations=["Re-run analysis after fixing configuration"],
-                risk_level="UNKNOWN",
-                confidence_score=0.0
-            )
+            return self.error_analysis(e)
+    
+    def security_inputs(self, repo_data: RepoAnalysisData, security_content: str) -> Dict[str, Any]:
+        """Prompt variables for one repository"""
+        return {
+            'code_structure': f"{repo_data.structure['file_count']} files analyzed",
+            'security_files': repo_data.security_files,
+            'languages': repo_data.languages_str,
+            'endpoints': repo_data.endpoint_paths,
+            'file_contents': security_content
+        }
+    
+    def error_analysis(self, e: Exception) -> SecurityAnalysisResult:
+        """Placeholder result reported when the LLM call fails"""
+        return SecurityAnalysisResult(
+            vulnerabilities=[f"Analysis error: {str(e)}"],
+            security_issues=[],
+            recommendations=["Re-run analysis after fixing configuration"],
+            risk_level="UNKNOWN",
+            confidence_score=0.0
+        )
     
     def parse_security_analysis(self, analysis_text: str) -> SecurityAnalysisResult:
         """Parse LLM output into structured security analysis"""
@@ -115,50 +183,45 @@ class CodeSecurityAnalystAgent(BaseAgent):
         risk_level = "MEDIUM"
         confidence_score = 0.7
         
-        lines = analysis_text.split('\n')
+        section_items = {
+            'CRITICAL_VULNERABILITIES': vulnerabilities,
+            'HIGH_RISK_ISSUES': vulnerabilities,
+            'MEDIUM_RISK_ISSUES': vulnerabilities,
+            'SECURITY_RECOMMENDATIONS': recommendations
+        }
         current_section = None
         
-        for line in lines:
+        for line in analysis_text.splitlines():
             line = line.strip()
+            if not line:
+                continue
             
-            if 'CRITICAL_VULNERABILITIES' in line.upper():
-                current_section = 'critical_vulnerabilities'
-            elif 'HIGH_RISK_ISSUES' in line.upper():
-                current_section = 'high_risk_issues'
-            elif 'MEDIUM_RISK_ISSUES' in line.upper():
-                current_section = 'medium_risk_issues'
-            elif 'SECURITY_RECOMMENDATIONS' in line.upper():
-                current_section = 'recommendations'
-            elif 'RISK_ASSESSMENT' in line.upper():
-                current_section = 'risk_assessment'
-            elif line and current_section:
-                if current_section in ['critical_vulnerabilities', 'high_risk_issues', 'medium_risk_issues']:
-                    vulnerabilities.append(line)
-                elif current_section == 'recommendations':
-                    recommendations.append(line)
-                elif current_section == 'risk_assessment':
-                    if 'CRITICAL' in line.upper():
-                        risk_level = 'CRITICAL'
-                    elif 'HIGH' in line.upper():
-                        risk_level = 'HIGH'
-                    elif 'LOW' in line.upper():
-                        risk_level = 'LOW'
-                    # Extract confidence score if present
-                    if 'confidence' in line.lower():
-                        try:
-                            import re
-                            score_match = re.search(r'(\d+(?:\.\d+)?)', line)
-                            if score_match:
-                                confidence_score = float(score_match.group(1))
-                                if confidence_score > 1:
-                                    confidence_score = confidence_score / 100
-                        except:
-                            pass
+            header = _SECURITY_HEADER_RE.search(line)
+            if header is not None:
+                current_section = header.group(0).upper()
+            elif current_section == 'RISK_ASSESSMENT':
+                upper_line = line.upper()
+                if 'CRITICAL' in upper_line:
+                    risk_level = 'CRITICAL'
+                elif 'HIGH' in upper_line:
+                    risk_level = 'HIGH'
+                elif 'LOW' in upper_line:
+                    risk_level = 'LOW'
+                # Extract confidence score if present
+                if 'CONFIDENCE' in upper_line:
+                    score_match = _SCORE_RE.search(line)
+                    if score_match:
+                        confidence_score = float(score_match.group(1))
+                        if confidence_score > 1:
+                            confidence_score = confidence_score / 100
+            elif current_section is not None:
+                section_items[current_section].append(line)
         
+        # LLM output often repeats bullets across sections; keep the first occurrence only
         return SecurityAnalysisResult(
-            vulnerabilities=vulnerabilities,
+            vulnerabilities=list(dict.fromkeys(vulnerabilities)),
             security_issues=security_issues,
-            recommendations=recommendations,
+            recommendations=list(dict.fromkeys(recommendations)),
             risk_level=risk_level,
             confidence_score=confidence_score
         )
\ No newline at end of file
@@ -1,14 +1,35 @@
 import streamlit as st
 import json
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, Tuple, List, Callable
 from datetime import datetime
 import pandas as pd
-import time
+import pyarrow as pa
 
 
 from core import SecurityOrchestrator
 
 
+logger = logging.getLogger(__name__)
+
+# Agent status cards, rendered once at import instead of on every rerun
+_AGENT_CARDS = (
+    ("Repo Cloner", "Clones repositories and analyzes structure"),
+    ("Security Analyst", "Scans for vulnerabilities and security issues"),
+    ("Code Reviewer", "Reviews code quality and best practices"),
+    ("Report Generator", "Collates and formats comprehensive reports")
+)
+_AGENT_CARD_TEMPLATE = """
+        <div class="agent-card">
+            <h4>{name}</h4>
+            <p>{description}</p>
+            <span style="color: green;">●</span> Ready
+        </div>
+        """
+_AGENT_CARDS_HTML = tuple(
+    _AGENT_CARD_TEMPLATE.format(name=name, description=description) for name, description in _AGENT_CARDS
+)
+
 
 # Streamlit UI
 def main():
@@ -45,43 +66,8 @@ def main():
     
     # Agent Status Dashboard
     st.markdown("### 🎯 Agent Status")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown("""
-        <div class="agent-card">
-            <h4>Repo Cloner</h4>
-            <p>Clones repositories and analyzes structure</p>
-            <span style="color: green;">●</span> Ready
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="agent-card">
-            <h4>Security Analyst</h4>
-            <p>Scans for vulnerabilities and security issues</p>
-            <span style="color: green;">●</span> Ready
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class="agent-card">
-            <h4>Code Reviewer</h4>
-            <p>Reviews code quality and best practices</p>
-            <span style="color: green;">●</span> Ready
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown("""
-        <div class="agent-card">
-            <h4>Report Generator</h4>
-            <p>Collates and formats comprehensive reports</p>
-            <span style="color: green;">●</span> Ready
-        </div>
-        """, unsafe_allow_html=True)
+    for column, card_html in zip(st.columns(4), _AGENT_CARDS_HTML):
+        column.markdown(card_html, unsafe_allow_html=True)
     
     # Configuration
     st.markdown("### ⚙️ Configuration")
@@ -98,6 +84,10 @@ def main():
         st.markdown("#### Analysis Options")
         deep_analysis = st.checkbox("Deep Analysis", value=True, help="Perform comprehensive analysis")
         include_deps = st.checkbox("Include Dependencies", value=True, help="Analyze dependency vulnerabilities")
+        use_llm_cache = st.checkbox("Use Cached LLM Responses", value=True,
+                                    help="Reuse earlier answers for identical prompts; untick to force fresh analysis")
+        keep_clone = st.checkbox("Keep Local Clone", value=False,
+                                 help="Keep the checkout after the analysis so re-runs only fetch new commits")
         
     if not api_key:
         st.warning("⚠️ Please enter your Groq API key to continue.")
@@ -111,7 +101,7 @@ def main():
             return
         
         # Initialize orchestrator
-        orchestrator = SecurityOrchestrator(api_key)
+        orchestrator = SecurityOrchestrator(api_key, use_llm_cache=use_llm_cache)
         
         # Progress tracking
         progress_container = st.container()
@@ -132,54 +122,36 @@ def main():
             report_progress = st.progress(0)
             report_status = st.empty()
             
+            # Progress bar, status line, running text and done text per agent
+            stage_widgets = {
+                'cloner': (cloner_progress, cloner_status,
+                           "🔄 Repo Cloner: Cloning repository...", "✅ Repo Cloner: Repository cloned"),
+                'security_analyst': (security_progress, security_status,
+                                     "🔒 Security Analyst: Running security analysis...",
+                                     "✅ Security Analyst: Security analysis completed"),
+                'code_reviewer': (review_progress, review_status,
+                                  "📝 Code Reviewer: Reviewing code quality...", "✅ Code Reviewer: Code review completed"),
+                'reporter': (report_progress, report_status,
+                             "📊 Reporter: Generating comprehensive report...", "✅ Reporter: Report generated successfully")
+            }
+            
+            def update_progress(stage: str, percent: int):
+                """Reflect a real stage transition from the orchestrator"""
+                bar, status, running_text, done_text = stage_widgets[stage]
+                bar.progress(percent)
+                status.text(done_text if percent >= 100 else running_text)
+            
             # Start analysis
             cloner_status.text("🔄 Repo Cloner: Initializing...")
-            cloner_progress.progress(10)
-            
+            security_status.text("🔒 Security Analyst: Standby...")
+            review_status.text("📝 Code Reviewer: Standby...")
+            report_status.text("📊 Reporter: Standby...")
             
             try:
-                # Run orchestrated analysis
-                #cloner_status.text("🔄 Repo Cloner: Cloning repository...")
-                cloner_progress.progress(50)
-                with st.spinner("🔄 Repo Cloner: Cloning repository..."):
-                    time.sleep(1.0)
-                
-                security_status.text("🔒 Security Analyst: Standby...")
-                review_status.text("📝 Code Reviewer: Standby...")
-                report_status.text("📊 Reporter: Standby...")
-                
                 # Execute analysis
-                result = orchestrator.orchestrate_analysis(repo_url)
+                result = orchestrator.orchestrate_analysis(repo_url, keep_clone=keep_clone, progress_cb=update_progress)
                 
                 if result['success']:
-                    # Update progress
-                    cloner_status.text("✅ Repo Cloner: Repository cloned")
-                    cloner_progress.progress(100)
-                    
-                    #security_status.text("🔒 Security Analyst: Running security analysis...")
-                    security_progress.progress(50)
-                    with st.spinner("🔒 Security Analyst: Running security analysis..."):
-                        time.sleep(3.0)
-                    
-                    security_status.text("✅ Security Analyst: Security analysis completed")
-                    security_progress.progress(100)
-                    
-                    #review_status.text("📝 Code Reviewer: Reviewing code quality...")
-                    review_progress.progress(50)
-                    with st.spinner("📝 Code Reviewer: Reviewing code quality..."):
-                        time.sleep(2.0)
-                    
-                    review_status.text("✅ Code Reviewer: Code review completed")
-                    review_progress.progress(100)
-                    
-                    #report_status.text("📊 Reporter: Generating comprehensive report...")
-                    report_progress.progress(50)
-                    with st.spinner("📊 Reporter: Generating comprehensive report..."):
-                        time.sleep(1.0)
-                    
-                    report_status.text("✅ Reporter: Report generated successfully")
-                    report_progress.progress(100)
-                    
                     # Display results
                     st.success("Analysis completed successfully")
                     display_analysis_results(result['results'])
@@ -198,7 +170,9 @@ def display_analysis_results(results: Dict[str, Any]):
     
     # Get the final report
     report_data = results['report']['report'] if results['report']['success'] else None
-    print(report_data)
+    # Only build the (large) repr when debug logging is actually on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Report data: %r", report_data)
     
     if not report_data:
         st.error("❌ Unable to generate comprehensive report")
@@ -260,8 +234,7 @@ def display_analysis_results(results: Dict[str, Any]):
     # Critical Findings
     if summary['critical_findings']:
         st.markdown("### 🚨 Critical Findings")
-        for finding in summary['critical_findings']:
-            st.error(f"⚠️ {finding}")
+        render_items(st.error, "⚠️", summary['critical_findings'])
     
     # Security Analysis Results
     st.markdown("### 🔒 Security Analysis")
@@ -274,16 +247,14 @@ def display_analysis_results(results: Dict[str, Any]):
         with col1:
             st.markdown("#### 🛡️ Security Vulnerabilities")
             if security_analysis['vulnerabilities']:
-                for vuln in security_analysis['vulnerabilities']:
-                    st.warning(f"🔍 {vuln}")
+                render_items(st.warning, "🔍", security_analysis['vulnerabilities'])
             else:
                 st.success("✅ No major vulnerabilities detected")
         
         with col2:
             st.markdown("#### 💡 Security Recommendations")
             if security_analysis['recommendations']:
-                for rec in security_analysis['recommendations']:
-                    st.info(f"💡 {rec}")
+                render_items(st.info, "💡", security_analysis['recommendations'])
             else:
                 st.success("✅ No specific security recommendations")
     else:
@@ -300,16 +271,14 @@ def display_analysis_results(results: Dict[str, Any]):
         with col1:
             st.markdown("#### 📋 Best Practices Violations")
             if code_review['best_practices_violations']:
-                for violation in code_review['best_practices_violations']:
-                    st.warning(f"📋 {violation}")
+                render_items(st.warning, "📋", code_review['best_practices_violations'])
             else:
                 st.success("✅ No major best practice violations found")
         
         with col2:
             st.markdown("#### 🏗️ Architecture Recommendations")
             if code_review['architecture_recommendations']:
-                for rec in code_review['architecture_recommendations']:
-                    st.info(f"🏗️ {rec}")
+                render_items(st.info, "🏗️", code_review['architecture_recommendations'])
             else:
                 st.success("✅ Architecture looks good")
     else:
@@ -318,8 +287,6 @@ def display_analysis_results(results: Dict[str, Any]):
     # Repository Overview
     st.markdown("### 📁 Repository Overview")
     
-    repo_overview = report_data['repository_overview']
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -334,7 +301,14 @@ def display_analysis_results(results: Dict[str, Any]):
     with col2:
         st.markdown("#### 🔗 API Endpoints")
         if repo_overview['endpoints']:
-            endpoint_df = pd.DataFrame(repo_overview['endpoints'])
+            # Arrow-backed columns go to st.dataframe without an object -> Arrow conversion.
+            # Multi-group route patterns yield (method, path) tuples; Arrow needs one string type
+            endpoint_rows = [
+                {**endpoint, 'endpoint': ' '.join(endpoint['endpoint'])}
+                if isinstance(endpoint['endpoint'], tuple) else endpoint
+                for endpoint in repo_overview['endpoints']
+            ]
+            endpoint_df = pa.Table.from_pylist(endpoint_rows).to_pandas(types_mapper=pd.ArrowDtype)
             st.dataframe(endpoint_df, use_container_width=True)
         else:
             st.info("No API endpoints found")
@@ -370,23 +344,23 @@ def display_analysis_results(results: Dict[str, Any]):
     
     with col1:
         st.markdown("#### 🔥 Immediate Action")
-        for item in priority_matrix['immediate_action']:
-            st.error(f"🔥 {item}")
+        render_items(st.error, "🔥", priority_matrix['immediate_action'])
     
     with col2:
         st.markdown("#### ⚡ Short Term")
-        for item in priority_matrix['short_term']:
-            st.warning(f"⚡ {item}")
+        render_items(st.warning, "⚡", priority_matrix['short_term'])
     
     with col3:
         st.markdown("#### 📅 Long Term")
-        for item in priority_matrix['long_term']:
-            st.info(f"📅 {item}")
+        render_items(st.info, "📅", priority_matrix['long_term'])
     
     # Download Report
     st.markdown("### 📥 Download Report")
     
-    report_json = json.dumps(report_data, indent=2)
+    metadata = report_data['metadata']
+    report_json, summary_text = render_report_downloads(
+        f"{metadata['repository']}@{metadata['generated_at']}", report_data
+    )
     
     col1, col2 = st.columns(2)
     
@@ -400,8 +374,6 @@ def display_analysis_results(results: Dict[str, Any]):
         )
     
     with col2:
-        # Generate summary text
-        summary_text = generate_summary_text(report_data)
         st.download_button(
             label="📝 Download Summary Report",
             data=summary_text,
@@ -410,56 +382,77 @@ def display_analysis_results(results: Dict[str, Any]):
             use_container_width=True
         )
 
+def render_items(alert: Callable[[str], Any], icon: str, items: List[str]):
+    """Render a list as one alert element instead of one Streamlit call per item"""
+    if items:
+        alert("\n\n".join(f"{icon} {item}" for item in items))
+
+@st.cache_data(max_entries=16)
+def render_report_downloads(report_key: str, _report_data: Dict[str, Any]) -> Tuple[str, str]:
+    """JSON and text renderings of a report, built once per report_key rather than on every rerun"""
+    # The leading underscore keeps Streamlit from hashing the whole report; report_key identifies it
+    return json.dumps(_report_data, indent=2), generate_summary_text(_report_data)
+
 def generate_summary_text(report_data: Dict[str, Any]) -> str:
     """Generate a text summary of the report"""
-
-    all_langs = set(report_data.get('executive_summary', {}).get('languages_detected', [])) | \
-            set(report_data.get('repository_overview', {}).get('languages', []))
+    
+    # Bind each report section once
+    metadata = report_data['metadata']
+    executive_summary = report_data['executive_summary']
+    security_analysis = report_data['security_analysis']
+    code_review = report_data['code_review']
+    priority_matrix = report_data['priority_matrix']
+    
+    # Both sources usually hold the same names; dedupe them in one pass
+    all_langs = dict.fromkeys((
+        *executive_summary.get('languages_detected', []),
+        *report_data.get('repository_overview', {}).get('languages', [])
+    ))
     
     summary = f"""
 MULTI-AGENT SECURITY ANALYSIS REPORT
 =====================================
 
-Repository: {report_data['metadata']['repository']}
-Generated: {report_data['metadata']['generated_at']}
+Repository: {metadata['repository']}
+Generated: {metadata['generated_at']}
 
 EXECUTIVE SUMMARY
 -----------------
-Risk Level: {report_data['executive_summary']['overall_risk_level']}
-Code Quality Score: {report_data['executive_summary']['code_quality_score']}/10
-Files Analyzed: {report_data['executive_summary']['total_files_analyzed']}
+Risk Level: {executive_summary['overall_risk_level']}
+Code Quality Score: {executive_summary['code_quality_score']}/10
+Files Analyzed: {executive_summary['total_files_analyzed']}
 Languages: {', '.join(sorted(all_langs))}
 
 CRITICAL FINDINGS
 -----------------
 """
     
-    for finding in report_data['executive_summary']['critical_findings']:
+    for finding in executive_summary['critical_findings']:
         summary += f"• {finding}\n"
     
     summary += f"""
 SECURITY ANALYSIS
 -----------------
-Status: {'✅ Completed' if report_data['security_analysis']['status'] else '❌ Failed'}
-Risk Level: {report_data['security_analysis']['risk_level']}
-Confidence: {report_data['security_analysis']['confidence_score']:.1%}
+Status: {'✅ Completed' if security_analysis['status'] else '❌ Failed'}
+Risk Level: {security_analysis['risk_level']}
+Confidence: {security_analysis['confidence_score']:.1%}
 
 Vulnerabilities Found:
 """
     
-    for vuln in report_data['security_analysis']['vulnerabilities']:
+    for vuln in security_analysis['vulnerabilities']:
         summary += f"• {vuln}\n"
     
     summary += f"""
 CODE REVIEW
 -----------
-Status: {'✅ Completed' if report_data['code_review']['status'] else '❌ Failed'}
-Maintainability Score: {report_data['code_review']['maintainability_score']}/10
+Status: {'✅ Completed' if code_review['status'] else '❌ Failed'}
+Maintainability Score: {code_review['maintainability_score']}/10
 
 Best Practices Violations:
 """
     
-    for violation in report_data['code_review']['best_practices_violations']:
+    for violation in code_review['best_practices_violations']:
         summary += f"• {violation}\n"
     
     summary += f"""
@@ -468,14 +461,14 @@ PRIORITY ACTIONS
 Immediate Action Required:
 """
     
-    for item in report_data['priority_matrix']['immediate_action']:
+    for item in priority_matrix['immediate_action']:
         summary += f"• {item}\n"
     
     summary += f"""
 Short Term Actions:
 """
     
-    for item in report_data['priority_matrix']['short_term']:
+    for item in priority_matrix['short_term']:
         summary += f"• {item}\n"
     
     return summary
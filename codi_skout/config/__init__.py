@@ -1,2 +1,2 @@
 from .prompts import CODE_REVIEW_PROMPT, SECURITY_ANALYSIS_PROMPT
-from .constants import CODE_EXTENSIONS, SECURITY_PATTERNS, URL_PATTERNS, ENDPOINT_PATTERNS
\ No newline at end of file
+from .constants import CODE_EXTENSIONS, LANGUAGE_NAMES, SECURITY_PATTERNS, URL_PATTERNS, ENDPOINT_PATTERNS, ENDPOINT_REGEXES, classify_security_file, detect_frameworks, is_potential_secret_file
\ No newline at end of file
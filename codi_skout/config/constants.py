@@ -1,9 +1,11 @@
 # Define file patterns to look for
 
+import fnmatch
 import re
+from typing import Dict, Final, Optional, Tuple
 
 # Security-sensitive file patterns
-SECURITY_PATTERNS = [
+SECURITY_PATTERNS: Final = (
     # Environment and configuration files
     '.env', '.env.local', '.env.development', '.env.production', '.env.staging',
     '.envrc', 'environment.yml', 'config.py', 'settings.py', 'configuration.py',
@@ -51,10 +53,31 @@ SECURITY_PATTERNS = [
     # SSL/TLS certificates
     '*.pem', '*.crt', '*.cer', '*.p12', '*.pfx', '*.jks',
     'ca-bundle.crt', 'server.crt', 'client.crt'
-]
+)
+
+# SECURITY_PATTERNS split into substring literals and whole-name globs, each tier
+# folded into one regex so a filename is classified in a single pass per tier
+_SECURITY_LITERALS = tuple(dict.fromkeys(p.lower() for p in SECURITY_PATTERNS if '*' not in p))
+_SECURITY_GLOBS = tuple(dict.fromkeys(p.lower() for p in SECURITY_PATTERNS if '*' in p))
+_SECURITY_LITERAL_RE = re.compile('|'.join(re.escape(p) for p in _SECURITY_LITERALS))
+_SECURITY_GLOB_RE = re.compile('|'.join(
+    f'(?P<g{i}>{fnmatch.translate(p)})' for i, p in enumerate(_SECURITY_GLOBS)
+))
+
+
+def classify_security_file(lower_name: str) -> Optional[str]:
+    """Return the SECURITY_PATTERNS entry a lowercased filename matches, or None"""
+    match = _SECURITY_LITERAL_RE.search(lower_name)
+    if match is not None:
+        return match.group(0)
+    
+    match = _SECURITY_GLOB_RE.match(lower_name)
+    if match is not None:
+        return _SECURITY_GLOBS[int(match.lastgroup[1:])]
+    return None
 
 # URL/Route definition files
-URL_PATTERNS = [
+URL_PATTERNS: Final = (
     # Python frameworks
     'routes.py', 'urls.py', 'app.py', 'main.py', 'server.py',
     'views.py', 'handlers.py', 'controllers.py', 'api.py',
@@ -95,10 +118,10 @@ URL_PATTERNS = [
     # Other languages
     'routes.scala', 'routes.kt', 'routes.swift', 'routes.dart',
     'routes.ex', 'routes.exs', 'router.ex', 'router.exs'
-]
+)
 
-# Programming language file extensions
-CODE_EXTENSIONS = [
+# Programming language file extensions (a set: only used for membership tests)
+CODE_EXTENSIONS = frozenset({
     # Popular languages
     '.py', '.js', '.ts', '.java', '.php', '.rb', '.go', '.rs', '.cpp', '.cs',
     
@@ -107,13 +130,13 @@ CODE_EXTENSIONS = [
     '.vue', '.svelte', '.astro',
     
     # Mobile development
-    '.swift', '.kt', '.dart', '.m', '.mm', '.h', '.hpp',
+    '.swift', '.kt', '.dart', '.m', '.mm', '.h',
     
     # Functional languages
     '.scala', '.clj', '.cljs', '.hs', '.ml', '.fsx', '.fs',
     
     # System languages
-    '.c', '.cc', '.cxx', '.cpp', '.hpp', '.hxx', '.h++',
+    '.c', '.cc', '.cxx', '.hpp', '.hxx', '.h++',
     
     # Scripting languages
     '.sh', '.bash', '.zsh', '.fish', '.ps1', '.bat', '.cmd',
@@ -127,10 +150,24 @@ CODE_EXTENSIONS = [
     '.ex', '.exs', '.erl', '.jl', '.nim', '.crystal', '.cr',
     '.zig', '.d', '.ada', '.adb', '.ads', '.f90', '.f95', '.f03',
     '.cob', '.cbl', '.pas', '.pp', '.lpr'
-]
+})
+
+# Display names for extensions whose language isn't just the extension itself
+LANGUAGE_NAMES = {
+    '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.ts': 'typescript', '.tsx': 'typescript',
+    '.rb': 'ruby', '.rs': 'rust', '.cs': 'c#', '.kt': 'kotlin', '.h': 'c',
+    '.cpp': 'c++', '.cc': 'c++', '.cxx': 'c++', '.hpp': 'c++', '.hxx': 'c++', '.h++': 'c++',
+    '.m': 'objective-c', '.mm': 'objective-c', '.htm': 'html',
+    '.clj': 'clojure', '.cljs': 'clojure', '.hs': 'haskell', '.ml': 'ocaml', '.fs': 'f#', '.fsx': 'f#',
+    '.sh': 'shell', '.bash': 'shell', '.zsh': 'shell', '.ps1': 'powershell', '.bat': 'batch', '.cmd': 'batch',
+    '.pl': 'perl', '.vim': 'vimscript', '.yml': 'yaml', '.md': 'markdown', '.rst': 'restructuredtext',
+    '.tex': 'latex', '.ex': 'elixir', '.exs': 'elixir', '.erl': 'erlang', '.jl': 'julia', '.cr': 'crystal',
+    '.adb': 'ada', '.ads': 'ada', '.f90': 'fortran', '.f95': 'fortran', '.f03': 'fortran',
+    '.cob': 'cobol', '.cbl': 'cobol', '.pas': 'pascal', '.pp': 'pascal', '.lpr': 'pascal'
+}
 
 # Comprehensive endpoint detection patterns
-ENDPOINT_PATTERNS = [
+ENDPOINT_PATTERNS: Final = (
     # Python - Flask
     r'@app\.route\([\'"]([^\'"]+)',
     r'@bp\.route\([\'"]([^\'"]+)',
@@ -244,7 +281,11 @@ ENDPOINT_PATTERNS = [
     r'url\([\'"]([^\'"]+)',
     r'endpoint\([\'"]([^\'"]+)',
     r'api\([\'"]([^\'"]+)',
-]
+)
+
+# Endpoint regexes compiled once at import, in pattern order. Several frameworks
+# share an identical pattern above; scanning it twice would report each match twice
+ENDPOINT_REGEXES = tuple(re.compile(pattern) for pattern in dict.fromkeys(ENDPOINT_PATTERNS))
 
 # Framework-specific configuration files
 FRAMEWORK_CONFIGS = {
@@ -262,6 +303,28 @@ FRAMEWORK_CONFIGS = {
     'vapor': ['Package.swift', 'main.swift', 'routes.swift']
 }
 
+# FRAMEWORK_CONFIGS inverted once: exact names map straight to their frameworks,
+# glob entries (e.g. '*.csproj') are kept as a small compiled tier
+_FILE_TO_FRAMEWORKS: Dict[str, Tuple[str, ...]] = {}
+_FRAMEWORK_GLOBS: Dict[str, Tuple[str, ...]] = {}
+for _framework, _files in FRAMEWORK_CONFIGS.items():
+    for _file in _files:
+        _index = _FRAMEWORK_GLOBS if '*' in _file else _FILE_TO_FRAMEWORKS
+        _index[_file] = _index.get(_file, ()) + (_framework,)
+_FRAMEWORK_GLOB_RES = tuple(
+    (re.compile(fnmatch.translate(pattern)), frameworks) for pattern, frameworks in _FRAMEWORK_GLOBS.items()
+)
+del _framework, _files, _file, _index
+
+
+def detect_frameworks(filename: str) -> Tuple[str, ...]:
+    """Return the frameworks whose FRAMEWORK_CONFIGS list a filename (or 'dir/' entry) belongs to"""
+    frameworks = _FILE_TO_FRAMEWORKS.get(filename, ())
+    for pattern, glob_frameworks in _FRAMEWORK_GLOB_RES:
+        if pattern.match(filename):
+            frameworks += glob_frameworks
+    return frameworks
+
 # Common security headers and middleware patterns
 SECURITY_MIDDLEWARE_PATTERNS = [
     r'@require_auth',
@@ -318,6 +381,17 @@ POTENTIAL_SECRET_FILES = [
     r'.*\.sqlite3$',
 ]
 
+# Same extensions as POTENTIAL_SECRET_FILES, checked with one str.endswith call
+SECRET_FILE_SUFFIXES = (
+    '.backup', '.bak', '.old', '.orig', '.tmp', '.temp',
+    '.log', '.dump', '.sql', '.db', '.sqlite', '.sqlite3',
+)
+
+
+def is_potential_secret_file(name: str) -> bool:
+    """Check whether a filename ends with a backup, dump or database suffix"""
+    return name.endswith(SECRET_FILE_SUFFIXES)
+
 
 
 
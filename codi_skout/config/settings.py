@@ -0,0 +1,10 @@
+# LLM settings shared by all agents
+LLM_MODEL = "llama-3.1-8b-instant"
+LLM_TEMPERATURE = 0.1
+
+# Upper bound on generated tokens; a full five-section report fits well within it
+LLM_MAX_TOKENS = 1500
+
+# The prompts ask the model to finish with this line, so generation stops there
+END_MARKER = "END_OF_ANALYSIS"
+LLM_STOP_SEQUENCES = [END_MARKER]
@@ -1,7 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SecurityAnalysisResult:
     """Security analysis result structure"""
     vulnerabilities: List[str]
@@ -10,7 +10,7 @@ class SecurityAnalysisResult:
     risk_level: str
     confidence_score: float
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CodeReviewResult:
     """Code review result structure"""
     best_practices_violations: List[str]
@@ -19,7 +19,7 @@ class CodeReviewResult:
     maintainability_score: float
     documentation_gaps: List[str]
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RepoAnalysisData:
     """Repository analysis data"""
     repo_url: str
@@ -27,4 +27,11 @@ class RepoAnalysisData:
     structure: Dict[str, Any]
     endpoints: List[Dict[str, str]]
     security_files: List[str]
-    languages: List[str]
\ No newline at end of file
+    languages: List[str]
+    # Prompt-ready projections, derived once when the data is built
+    languages_str: str = field(init=False, repr=False, compare=False)
+    endpoint_paths: List[Any] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'languages_str', ', '.join(self.languages))
+        object.__setattr__(self, 'endpoint_paths', [ep['endpoint'] for ep in self.endpoints])
\ No newline at end of file
@@ -0,0 +1,47 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+# Characters cached per file; covers the largest head any agent samples
+CACHED_HEAD_CHARS = 4096
+
+# A UTF-8 character is at most 4 bytes, so this many bytes always hold max_chars characters
+_MAX_BYTES_PER_CHAR = 4
+
+
+def _read_head(path: str, max_chars: int) -> Optional[str]:
+    """Read up to max_chars characters of a file with a single raw read, or None if it can't be read"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        data = os.read(fd, max_chars * _MAX_BYTES_PER_CHAR)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    
+    # Match text-mode open(): drop undecodable bytes and normalize line endings
+    text = data.decode('utf-8', 'ignore').replace('\r\n', '\n').replace('\r', '\n')
+    return text[:max_chars]
+
+
+@lru_cache(maxsize=4096)
+def _read_cached_head(path: str) -> Optional[str]:
+    """Read and cache the head of a file, or None if it can't be read"""
+    return _read_head(path, CACHED_HEAD_CHARS)
+
+
+def read_file_head(path: str, max_chars: int) -> Optional[str]:
+    """Return up to max_chars characters of a file, shared across agents"""
+    if max_chars > CACHED_HEAD_CHARS:
+        return _read_head(path, max_chars)
+
+    content = _read_cached_head(path)
+    return content[:max_chars] if content is not None else None
+
+
+def clear_file_cache():
+    """Drop cached file contents once a cloned repository changes or is removed"""
+    _read_cached_head.cache_clear()
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from config.settings import LLM_MODEL, LLM_MAX_TOKENS
+
+# Bump to invalidate every cached response after a prompt or parser format change
+CACHE_SCHEMA_VERSION = "1"
+
+# One JSON file per response, named by the prompt hash
+LLM_CACHE_DIR = Path.home() / ".cache" / "codiskout" / "llm"
+
+
+def prompt_key(prompt: str) -> str:
+    """Content hash of a fully rendered prompt and the settings that shape its answer"""
+    material = f"{CACHE_SCHEMA_VERSION}\n{LLM_MODEL}\n{LLM_MAX_TOKENS}\n{prompt}"
+    return hashlib.blake2b(material.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def get_cached_response(key: str) -> Optional[str]:
+    """Return a cached LLM response, or None on a miss or unreadable entry"""
+    try:
+        with open(LLM_CACHE_DIR / f"{key}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)['response']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def put_cached_response(key: str, response: str):
+    """Store an LLM response; best effort, a failed write only costs a future miss"""
+    try:
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename, so concurrent agents never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=LLM_CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'response': response}, f)
+            os.replace(tmp_path, LLM_CACHE_DIR / f"{key}.json")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
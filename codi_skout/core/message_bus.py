@@ -2,7 +2,10 @@ from dataclasses import dataclass
 from typing import Dict, Any
 from datetime import datetime
 
-@dataclass
+# Most recent messages an agent or the orchestrator keeps; older ones are dropped
+MESSAGE_HISTORY_LIMIT = 1000
+
+@dataclass(slots=True, frozen=True)
 class AgentMessage:
     """Standard message format for agent communication"""
     sender: str
@@ -1,11 +1,14 @@
-from typing import List, Dict, Any
-from .message_bus import AgentMessage
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Deque, Dict, Any, Optional, Callable
+from .message_bus import AgentMessage, MESSAGE_HISTORY_LIMIT
 
 from agents import (
     GitHubClonerAgent,
     CodeSecurityAnalystAgent,
     CodeReviewerAgent,
-    ReporterAgent
+    ReporterAgent,
+    create_llm
 )
 
 
@@ -14,21 +17,32 @@ from agents import (
 class SecurityOrchestrator:
     """Main orchestrator that coordinates all agents"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, use_llm_cache: bool = True):
         self.api_key = api_key
+        # One LLM client shared by all agents instead of one per agent
+        llm = create_llm(api_key)
         self.agents = {
-            'cloner': GitHubClonerAgent(api_key),
-            'security_analyst': CodeSecurityAnalystAgent(api_key),
-            'code_reviewer': CodeReviewerAgent(api_key),
-            'reporter': ReporterAgent(api_key)
+            'cloner': GitHubClonerAgent(api_key, llm),
+            'security_analyst': CodeSecurityAnalystAgent(api_key, llm),
+            'code_reviewer': CodeReviewerAgent(api_key, llm),
+            'reporter': ReporterAgent(api_key, llm)
         }
-        self.message_bus: List[AgentMessage] = []
+        for agent in self.agents.values():
+            agent.use_llm_cache = use_llm_cache
+        self.message_bus: Deque[AgentMessage] = deque(maxlen=MESSAGE_HISTORY_LIMIT)
     
-    def orchestrate_analysis(self, repo_url: str) -> Dict[str, Any]:
-        """Orchestrate the complete analysis workflow"""
+    def orchestrate_analysis(self, repo_url: str, keep_clone: bool = False,
+                             progress_cb: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+        """Orchestrate the complete analysis workflow (keep_clone lets re-runs reuse the checkout)"""
+        
+        def report_progress(stage: str, percent: int):
+            # progress_cb receives the agent key and 50 (started) or 100 (finished)
+            if progress_cb is not None:
+                progress_cb(stage, percent)
         
         try:
             # Step 1: Clone repository
+            report_progress('cloner', 50)
             clone_result = self.agents['cloner'].process_task({'repo_url': repo_url})
             
             if not clone_result['success']:
@@ -38,21 +52,38 @@ class SecurityOrchestrator:
                     'message': 'Failed to clone repository'
                 }
             
-            # Step 2: Security Analysis
-            security_result = self.agents['security_analyst'].process_task(clone_result)
+            report_progress('cloner', 100)
+            
+            # Steps 2 and 3: Security Analysis and Code Review are independent and
+            # mostly wait on the LLM, so run them side by side
+            analysis_results = {}
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = {}
+                for stage in ('security_analyst', 'code_reviewer'):
+                    report_progress(stage, 50)
+                    futures[executor.submit(self.agents[stage].process_task, clone_result)] = stage
+                
+                # Progress is reported from this thread, as completions come in
+                for future in as_completed(futures):
+                    stage = futures[future]
+                    analysis_results[stage] = future.result()
+                    report_progress(stage, 100)
             
-            # Step 3: Code Review
-            code_review_result = self.agents['code_reviewer'].process_task(clone_result)
+            security_result = analysis_results['security_analyst']
+            code_review_result = analysis_results['code_reviewer']
             
             # Step 4: Generate Report
+            report_progress('reporter', 50)
             report_result = self.agents['reporter'].process_task({
                 'repo_data': clone_result,
                 'security_analysis': security_result,
                 'code_review': code_review_result
             })
+            report_progress('reporter', 100)
             
             # Cleanup
-            self.agents['cloner'].cleanup()
+            if not keep_clone:
+                self.agents['cloner'].cleanup()
             
             return {
                 'success': True,